@@ -0,0 +1,9 @@
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+else:
+    HAS_NUMPY = True
+
+__all__ = ("HAS_NUMPY", "np")
@@ -1,14 +1,35 @@
+import argparse
+import logging
+import math
+import os
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import cast
+
+from src.compat import HAS_NUMPY, np
+from src.shares_format import OUTPUT_BATCH_SIZE, format_percentages
+from src.shares_parser import iter_share_blocks, read_binary_shares, read_total_count
 
 APP_NAME = "shares"
+ENGINE_PYTHON = "python"
+ENGINE_NUMPY = "numpy"
+PARSER_TEXT = "text"
+PARSER_MMAP = "mmap"
+PARSER_BINARY = "binary"
+OUTPUT_SEQUENTIAL = "sequential"
+OUTPUT_PARALLEL = "parallel"
+RECORD_WIDTH = len("0.000\n")
+MAX_FIXED_WIDTH_PERCENTAGE = 9.999
 
 
 @dataclass(slots=True)
 class SharesSchema:
     total_count: int
     total_sum: float = 0.0
-    data: list[float] = field(default_factory=list)
+    data: Sequence[float] = field(default_factory=lambda: array("d"))
 
     def validate(self) -> None:
         if self.total_count != len(self.data):
@@ -21,8 +42,21 @@ class SharesCalculator:
         self._shares = shares_schema.data
         self._shares_sum = shares_schema.total_sum
 
-    def calculate(self) -> list[float]:
-        return [share / self._shares_sum for share in self._shares]
+    def calculate(self) -> Sequence[float]:
+        return array("d", (share / self._shares_sum for share in self._shares))
+
+
+class SharesCalculatorNumpy(SharesCalculator):
+    def calculate(self) -> Sequence[float]:
+        if isinstance(self._shares, array | memoryview):
+            shares = np.frombuffer(self._shares, dtype=np.float64)
+        else:
+            shares = np.fromiter(self._shares, dtype=np.float64, count=len(self._shares))
+        if not self._shares_sum and len(shares):
+            # NumPy only warns and yields nan, the python engine raises on the first share
+            msg = "float division by zero"
+            raise ZeroDivisionError(msg)
+        return cast("Sequence[float]", shares / self._shares_sum)
 
 
 class DataFileIO:
@@ -32,36 +66,141 @@ class DataFileIO:
 
     def read_input(self) -> SharesSchema:
         shares_schema: SharesSchema | None = None
+        shares = array("d")
         with Path(f"{self._input_dir}/{APP_NAME}.txt").open() as file:
             for line in file:
                 if not line.strip():
                     continue
                 if shares_schema:
                     shares_schema.total_sum += float(line)
-                    shares_schema.data.append(float(line))
+                    shares.append(float(line))
                 else:
-                    shares_schema = SharesSchema(total_count=int(line))
+                    shares_schema = SharesSchema(total_count=int(line), data=shares)
         if not shares_schema:
             msg = f"input file invalid, check inputs/{APP_NAME}.txt"
             raise ValueError(msg)
         return shares_schema
 
-    def write_output(self, percentages: list[float]) -> None:
+    def read_input_mmap(self) -> SharesSchema:
+        path = Path(f"{self._input_dir}/{APP_NAME}.txt")
+        total_count = read_total_count(path)
+        if total_count is None:
+            msg = f"input file invalid, check inputs/{APP_NAME}.txt"
+            raise ValueError(msg)
+        shares = array("d")
+        shares_schema = SharesSchema(total_count=total_count, data=shares)
+        for block in iter_share_blocks(path):
+            shares.extend(block)
+        shares_schema.total_sum = math.fsum(shares)
+        return shares_schema
+
+    def read_input_binary(self) -> SharesSchema:
+        total_count, shares = read_binary_shares(Path(f"{self._input_dir}/{APP_NAME}.bin"))
+        return SharesSchema(total_count=total_count, total_sum=math.fsum(shares), data=shares)
+
+    def write_output(self, percentages: Sequence[float]) -> None:
         path = Path(f"{self._output_dir}/{APP_NAME}.txt")
         path.parent.mkdir(exist_ok=True)
-        with path.open("w") as file:
-            for percentage in percentages:
-                file.write(f"{percentage:.3f}\n")
-
+        with path.open("wb") as file:
+            for start in range(0, len(percentages), OUTPUT_BATCH_SIZE):
+                file.write(format_percentages(percentages[start : start + OUTPUT_BATCH_SIZE]))
+
+    def write_output_parallel(self, percentages: Sequence[float], workers: int | None = None) -> None:
+        if not _is_fixed_width(percentages):
+            self.write_output(percentages)
+            return
+        path = Path(f"{self._output_dir}/{APP_NAME}.txt")
+        path.parent.mkdir(exist_ok=True)
+        with path.open("wb") as file:
+            file.truncate(len(percentages) * RECORD_WIDTH)
+
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(-(-len(percentages) // workers), 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_write_fixed_width_chunk, path, start, percentages[start : start + chunk_size])
+                for start in range(0, len(percentages), chunk_size)
+            ]
+        try:
+            for future in futures:
+                future.result()
+        except ValueError:
+            # a record slipped past the prescan, the preallocated file is rewritten sequentially
+            self.write_output(percentages)
+
+
+def _is_fixed_width(percentages: Sequence[float]) -> bool:
+    if not len(percentages):
+        return True
+    if HAS_NUMPY and isinstance(percentages, np.ndarray):
+        return not np.signbit(percentages).any() and bool(percentages.max() < MAX_FIXED_WIDTH_PERCENTAGE)
+    min_percentage = min(percentages)
+    if min_percentage == 0.0 and any(math.copysign(1.0, value) < 0.0 for value in percentages if value == 0.0):
+        # -0.0 passes the range check but is formatted as "-0.000"
+        return False
+    return min_percentage >= 0.0 and max(percentages) < MAX_FIXED_WIDTH_PERCENTAGE
+
+
+def _write_fixed_width_chunk(path: Path, start: int, percentages: Sequence[float]) -> None:
+    chunk = format_percentages(percentages)
+    if len(chunk) != len(percentages) * RECORD_WIDTH:
+        msg = f"records starting at {start} are not {RECORD_WIDTH} bytes wide"
+        raise ValueError(msg)
+    with path.open("r+b") as file:
+        file.seek(start * RECORD_WIDTH)
+        file.write(chunk)
+
+
+def _get_calculator_class(engine: str) -> type[SharesCalculator]:
+    if engine == ENGINE_NUMPY and HAS_NUMPY:
+        return SharesCalculatorNumpy
+    return SharesCalculator
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog=f"python -m src.{APP_NAME}")
+    parser.add_argument("--parser", choices=(PARSER_TEXT, PARSER_MMAP, PARSER_BINARY), default=PARSER_TEXT)
+    parser.add_argument("--engine", choices=(ENGINE_PYTHON, ENGINE_NUMPY), default=ENGINE_NUMPY)
+    parser.add_argument("--output", choices=(OUTPUT_SEQUENTIAL, OUTPUT_PARALLEL), default=OUTPUT_SEQUENTIAL)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be positive")
+    return args
+
+
+def run(
+    *,
+    parser: str = PARSER_TEXT,
+    engine: str = ENGINE_NUMPY,
+    output: str = OUTPUT_SEQUENTIAL,
+    workers: int | None = None,
+) -> None:
+    logger = logging.getLogger(APP_NAME)
 
-def main() -> None:
     data_file_io = DataFileIO()
-    shares_schema = data_file_io.read_input()
+    if parser == PARSER_BINARY:
+        shares_schema = data_file_io.read_input_binary()
+    elif parser == PARSER_MMAP:
+        shares_schema = data_file_io.read_input_mmap()
+    else:
+        shares_schema = data_file_io.read_input()
     shares_schema.validate()
 
-    calulator = SharesCalculator(shares_schema)
+    calculator_class = _get_calculator_class(engine)
+    logger.info("selected class: %s", calculator_class.__name__)
+    calulator = calculator_class(shares_schema)
     result = calulator.calculate()
-    data_file_io.write_output(result)
+    if output == OUTPUT_PARALLEL:
+        data_file_io.write_output_parallel(result, workers)
+    else:
+        data_file_io.write_output(result)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+    run(parser=args.parser, engine=args.engine, output=args.output, workers=args.workers)
 
 
 if __name__ == "__main__":
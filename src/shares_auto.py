@@ -0,0 +1,78 @@
+import argparse
+import logging
+import os
+from pathlib import Path
+
+from src import shares, shares_ram
+from src.shares_parser import read_total_count
+
+APP_NAME = "shares"
+STRATEGY_IN_MEMORY = "in-memory"
+STRATEGY_STREAMING = "streaming"
+STRATEGY_PARALLEL = "chunked-parallel"
+IN_MEMORY_BYTES_PER_SHARE = 16
+IN_MEMORY_RESERVE_FACTOR = 2
+PARALLEL_MIN_FILE_SIZE = 1 << 26
+
+
+def _get_available_memory() -> int | None:
+    meminfo = Path("/proc/meminfo")
+    if meminfo.exists():
+        for line in meminfo.read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _get_strategy(*, file_size: int, total_count: int, available_memory: int | None, cpu_count: int) -> str:
+    required_memory = total_count * IN_MEMORY_BYTES_PER_SHARE * IN_MEMORY_RESERVE_FACTOR
+    if available_memory is not None and required_memory <= available_memory:
+        return STRATEGY_IN_MEMORY
+    if cpu_count > 1 and file_size >= PARALLEL_MIN_FILE_SIZE:
+        return STRATEGY_PARALLEL
+    return STRATEGY_STREAMING
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.shares_auto")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be positive")
+    return args
+
+
+def main() -> None:
+    logger = logging.getLogger(APP_NAME)
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+
+    path = Path(f"inputs/{APP_NAME}.txt")
+    cpu_count = args.workers or os.cpu_count() or 1
+    file_size = path.stat().st_size
+    strategy = _get_strategy(
+        file_size=file_size,
+        total_count=read_total_count(path) or 0,
+        available_memory=_get_available_memory(),
+        cpu_count=cpu_count,
+    )
+    logger.info("selected strategy: %s", strategy)
+
+    if strategy == STRATEGY_IN_MEMORY:
+        output = (
+            shares.OUTPUT_PARALLEL
+            if cpu_count > 1 and file_size >= PARALLEL_MIN_FILE_SIZE
+            else shares.OUTPUT_SEQUENTIAL
+        )
+        shares.run(parser=shares.PARSER_MMAP, engine=shares.ENGINE_NUMPY, output=output, workers=args.workers)
+    elif strategy == STRATEGY_PARALLEL:
+        shares_ram.run(mode=shares_ram.MODE_PARALLEL, workers=args.workers)
+    else:
+        shares_ram.run(mode=shares_ram.MODE_MMAP)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from collections.abc import Iterable
+
+from src.compat import HAS_NUMPY, np
+
+PERCENTAGE_SCALE = 1000
+PERCENTAGE_TABLE = tuple(
+    f"{value // PERCENTAGE_SCALE}.{value % PERCENTAGE_SCALE:03d}\n".encode() for value in range(PERCENTAGE_SCALE + 1)
+)
+TIE_TOLERANCE = 1e-9
+OUTPUT_BATCH_SIZE = 1 << 16
+
+
+def _format_percentage(percentage: float) -> bytes:
+    if 0.0 < percentage <= 1.0:
+        scaled = percentage * PERCENTAGE_SCALE
+        value = round(scaled)
+        if abs(scaled - value) < 0.5 - TIE_TOLERANCE:
+            return PERCENTAGE_TABLE[value]
+    return f"{percentage:.3f}\n".encode()
+
+
+def format_percentages(percentages: Iterable[float]) -> bytes:
+    if HAS_NUMPY and isinstance(percentages, np.ndarray):
+        return _format_percentages_numpy(percentages)
+    return b"".join(map(_format_percentage, percentages))
+
+
+def _format_percentages_numpy(percentages: "np.ndarray") -> bytes:
+    if not ((percentages > 0.0) & (percentages <= 1.0)).all():
+        return b"".join(map(_format_percentage, percentages.tolist()))
+    scaled = percentages * PERCENTAGE_SCALE
+    values = np.rint(scaled)
+    for idx in np.flatnonzero(np.abs(scaled - values) >= 0.5 - TIE_TOLERANCE).tolist():
+        values[idx] = int(f"{percentages[idx]:.3f}".replace(".", ""))
+    table = np.frombuffer(b"".join(PERCENTAGE_TABLE), dtype=np.uint8).reshape(len(PERCENTAGE_TABLE), -1)
+    return table[values.astype(np.intp)].tobytes()
@@ -0,0 +1,87 @@
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from src.compat import np
+
+PARSE_BLOCK_SIZE = 1 << 20
+BINARY_MAGIC = b"SHARES01"
+BINARY_HEADER = struct.Struct("<8sQ")
+BINARY_SHARE_SIZE = struct.calcsize("<d")
+
+
+def read_total_count(path: Path) -> int | None:
+    with path.open("rb") as file:
+        header = file.readline()
+    return int(header) if header.strip() else None
+
+
+def _iter_text_blocks(path: Path, block_size: int) -> Iterator[bytes]:
+    if not path.stat().st_size:
+        return
+    with path.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        start = buffer.find(b"\n") + 1
+        if not start:
+            return
+        while start < len(buffer):
+            end = buffer.find(b"\n", start + block_size)
+            end = len(buffer) if end == -1 else end + 1
+            yield buffer[start:end]
+            start = end
+
+
+def iter_share_blocks(path: Path, block_size: int = PARSE_BLOCK_SIZE) -> Iterator["array[float]"]:
+    for block in _iter_text_blocks(path, block_size):
+        yield array("d", map(float, block.split()))
+
+
+def iter_share_blocks_numpy(path: Path, block_size: int = PARSE_BLOCK_SIZE) -> Iterator["np.ndarray"]:
+    for block in _iter_text_blocks(path, block_size):
+        yield np.array(block.split(), dtype=np.float64)
+
+
+def read_binary_shares(path: Path) -> tuple[int, Sequence[float]]:
+    size = path.stat().st_size
+    with path.open("rb") as file:
+        header = file.read(BINARY_HEADER.size)
+        if (
+            len(header) != BINARY_HEADER.size
+            or BINARY_HEADER.unpack(header)[0] != BINARY_MAGIC
+            or (size - BINARY_HEADER.size) % BINARY_SHARE_SIZE
+        ):
+            msg = f"binary input file invalid, check {path}"
+            raise ValueError(msg)
+        _, total_count = BINARY_HEADER.unpack(header)
+        if size == BINARY_HEADER.size:
+            return total_count, array("d")
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    shares = memoryview(buffer)[BINARY_HEADER.size :].cast("d")
+    if sys.byteorder != "little":
+        swapped = array("d", shares)
+        swapped.byteswap()
+        return total_count, swapped
+    return total_count, shares
+
+
+def convert_to_binary(path_in: Path, path_out: Path) -> None:
+    total_count = read_total_count(path_in)
+    if total_count is None:
+        msg = f"input file invalid, check {path_in}"
+        raise ValueError(msg)
+    with path_out.open("wb") as file:
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, total_count))
+        for shares in iter_share_blocks(path_in):
+            if sys.byteorder != "little":
+                shares.byteswap()
+            shares.tofile(file)
+
+
+def main() -> None:
+    convert_to_binary(Path("inputs/shares.txt"), Path("inputs/shares.bin"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,48 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from itertools import chain, repeat
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, cast
+
+from src.compat import HAS_NUMPY, np
+from src.shares_format import OUTPUT_BATCH_SIZE, format_percentages
+from src.shares_parser import (
+    PARSE_BLOCK_SIZE,
+    iter_share_blocks,
+    iter_share_blocks_numpy,
+    read_binary_shares,
+    read_total_count,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
 
 APP_NAME = "shares"
+MODE_STREAMING = "streaming"
+MODE_SPILL = "spill"
+MODE_PARALLEL = "parallel"
+MODE_MMAP = "mmap"
+MODE_BINARY = "binary"
+MODE_INDEXED = "indexed"
+MODES = (MODE_STREAMING, MODE_SPILL, MODE_PARALLEL, MODE_MMAP, MODE_BINARY, MODE_INDEXED)
+INDEX_HASH_SAMPLE_SIZE = 1 << 20
+
+
+@dataclass(slots=True)
+class SharesIndexSchema:
+    size: int
+    mtime_ns: int
+    content_hash: str
+    total_count: int
+    total_sum: float
 
 
 class SharesCalculator:
@@ -10,6 +52,13 @@ class SharesCalculator:
     def calculate_percentage(self, share: float) -> float:
         return share / self._total_sum
 
+    def calculate_percentages(self, shares: "np.ndarray") -> "np.ndarray":
+        if not self._total_sum and len(shares):
+            # NumPy only warns and yields nan, calculate_percentage raises on the first share
+            msg = "float division by zero"
+            raise ZeroDivisionError(msg)
+        return shares / self._total_sum
+
 
 class DataFileIO:
     def __init__(self) -> None:
@@ -30,29 +79,245 @@ class DataFileIO:
                     total_sum += float(value)
         return total_count, total_sum
 
+    def read_total_sum_indexed(self) -> tuple[int, float]:
+        path = Path(f"{self._input_dir}/{APP_NAME}.txt")
+        path_index = Path(f"{self._input_dir}/{APP_NAME}.idx.json")
+        stat = path.stat()
+        content_hash = _hash_content(path, stat.st_size)
+        try:
+            index = SharesIndexSchema(**json.loads(path_index.read_text()))
+        except (OSError, ValueError, TypeError):
+            index = None
+        if index and (index.size, index.mtime_ns, index.content_hash) == (stat.st_size, stat.st_mtime_ns, content_hash):
+            return index.total_count, index.total_sum
+
+        total_count, total_sum = self.read_total_sum()
+        index = SharesIndexSchema(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            content_hash=content_hash,
+            total_count=total_count,
+            total_sum=total_sum,
+        )
+        with suppress(OSError):
+            path_index.write_text(json.dumps(asdict(index)))
+        return total_count, total_sum
+
+    def read_total_sum_parallel(self, workers: int | None = None) -> tuple[int, float]:
+        path = Path(f"{self._input_dir}/{APP_NAME}.txt")
+        workers = workers or os.cpu_count() or 1
+        size = path.stat().st_size
+        with path.open("rb") as file:
+            header = file.readline()
+            total_count = int(header) if header.strip() else 0
+            bounds = [file.tell()]
+            step = max((size - bounds[0]) // workers, 1)
+            for offset in range(bounds[0] + step, size, step):
+                if offset <= bounds[-1]:
+                    continue
+                file.seek(offset - 1)
+                file.readline()
+                bounds.append(file.tell())
+        bounds.append(size)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = executor.map(_sum_range_partials, repeat(path), bounds[:-1], bounds[1:])
+            total_sum = math.fsum(_split_exact_sum(list(chain.from_iterable(partials))))
+        return total_count, total_sum
+
+    def read_total_sum_mmap(self) -> tuple[int, float]:
+        path = Path(f"{self._input_dir}/{APP_NAME}.txt")
+        total_count = read_total_count(path) or 0
+        # a single fsum across blocks keeps the total exact; ndarray.data yields plain floats instead of numpy scalars
+        if HAS_NUMPY:
+            total_sum = math.fsum(chain.from_iterable(block.data for block in iter_share_blocks_numpy(path)))
+        else:
+            total_sum = math.fsum(chain.from_iterable(iter_share_blocks(path)))
+        return total_count, total_sum
+
+    def read_total_sum_binary(self) -> tuple[int, float]:
+        total_count, shares = read_binary_shares(Path(f"{self._input_dir}/{APP_NAME}.bin"))
+        return total_count, math.fsum(shares)
+
     def calculate_percentages_streaming(self, calculator: SharesCalculator) -> None:
         path_in = Path(f"{self._input_dir}/{APP_NAME}.txt")
         path_out = Path(f"{self._output_dir}/{APP_NAME}.txt")
         path_out.parent.mkdir(exist_ok=True)
 
-        with path_in.open() as file_in, path_out.open("w") as file_out:
+        with path_in.open() as file_in, path_out.open("wb") as file_out:
+            percentages: list[float] = []
             for idx, line in enumerate(file_in):
                 value = line.strip()
                 if not value or idx == 0:
                     continue
-                percentage = calculator.calculate_percentage(float(value))
-                file_out.write(f"{percentage:.3f}\n")
+                percentages.append(calculator.calculate_percentage(float(value)))
+                if len(percentages) == OUTPUT_BATCH_SIZE:
+                    file_out.write(format_percentages(percentages))
+                    percentages.clear()
+            file_out.write(format_percentages(percentages))
 
+    def calculate_percentages_streaming_mmap(self, calculator: SharesCalculator) -> None:
+        path_in = Path(f"{self._input_dir}/{APP_NAME}.txt")
+        path_out = Path(f"{self._output_dir}/{APP_NAME}.txt")
+        path_out.parent.mkdir(exist_ok=True)
 
-def main() -> None:
-    data_file_io = DataFileIO()
-    total_count, total_sum = data_file_io.read_total_sum()
+        with path_out.open("wb") as file_out:
+            if HAS_NUMPY:
+                for shares_numpy in iter_share_blocks_numpy(path_in):
+                    file_out.write(format_percentages(calculator.calculate_percentages(shares_numpy)))
+                return
+            for shares in iter_share_blocks(path_in):
+                file_out.write(format_percentages([calculator.calculate_percentage(share) for share in shares]))
+
+    def calculate_percentages_streaming_binary(self, calculator: SharesCalculator) -> None:
+        _, shares = read_binary_shares(Path(f"{self._input_dir}/{APP_NAME}.bin"))
+        path_out = Path(f"{self._output_dir}/{APP_NAME}.txt")
+        path_out.parent.mkdir(exist_ok=True)
+
+        with path_out.open("wb") as file_out:
+            if HAS_NUMPY:
+                shares_numpy = np.frombuffer(cast("Buffer", shares), dtype=np.float64)
+                for start in range(0, len(shares_numpy), OUTPUT_BATCH_SIZE):
+                    block_numpy = shares_numpy[start : start + OUTPUT_BATCH_SIZE]
+                    file_out.write(format_percentages(calculator.calculate_percentages(block_numpy)))
+                return
+            for start in range(0, len(shares), OUTPUT_BATCH_SIZE):
+                block = shares[start : start + OUTPUT_BATCH_SIZE]
+                file_out.write(format_percentages([calculator.calculate_percentage(share) for share in block]))
+
+    def read_total_sum_spilled(self, spill: BinaryIO) -> tuple[int, float]:
+        total_count = 0
+        total_sum = 0.0
+        shares = array("d")
+        with Path(f"{self._input_dir}/{APP_NAME}.txt").open() as file:
+            for idx, line in enumerate(file):
+                value = line.strip()
+                if not value:
+                    continue
+                if idx == 0:
+                    total_count = int(value)
+                else:
+                    share = float(value)
+                    total_sum += share
+                    shares.append(share)
+                    if len(shares) == OUTPUT_BATCH_SIZE:
+                        shares.tofile(spill)
+                        del shares[:]
+        shares.tofile(spill)
+        spill.seek(0)
+        return total_count, total_sum
+
+    def calculate_percentages_spilled(self, calculator: SharesCalculator, spill: BinaryIO) -> None:
+        path_out = Path(f"{self._output_dir}/{APP_NAME}.txt")
+        path_out.parent.mkdir(exist_ok=True)
+
+        shares = array("d")
+        with path_out.open("wb") as file_out:
+            while chunk := spill.read(OUTPUT_BATCH_SIZE * shares.itemsize):
+                shares.frombytes(chunk)
+                file_out.write(format_percentages([calculator.calculate_percentage(share) for share in shares]))
+                del shares[:]
+
+
+def _hash_content(path: Path, size: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as file:
+        digest.update(file.read(INDEX_HASH_SAMPLE_SIZE))
+        if size > INDEX_HASH_SAMPLE_SIZE:
+            file.seek(max(size - INDEX_HASH_SAMPLE_SIZE, INDEX_HASH_SAMPLE_SIZE))
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _split_exact_sum(values: list[float]) -> list[float]:
+    try:
+        part = math.fsum(values)
+    except (OverflowError, ValueError):
+        # inf - inf and overflowing sums have no exact parts, keep what the sequential loop would produce
+        return [sum(values)]
+    if not math.isfinite(part):
+        return [part]
+    # each fsum is correctly rounded, so negating it and summing again leaves the exact remainder
+    parts: list[float] = []
+    while part:
+        parts.append(part)
+        values.append(-part)
+        part = math.fsum(values)
+    return parts
+
+
+def _sum_range_partials(path: Path, start: int, end: int) -> list[float]:
+    partials: list[float] = []
+    with path.open("rb") as file:
+        file.seek(start)
+        while (position := file.tell()) < end:
+            block = file.read(min(PARSE_BLOCK_SIZE, end - position))
+            if not block.endswith(b"\n") and file.tell() < end:
+                block += file.readline()
+            partials.extend(_split_exact_sum(list(map(float, block.split()))))
+    return partials
+
+
+def _validate_total_count(total_count: int) -> None:
     if total_count <= 0:
         msg = f"Invalid total_count value: {total_count}"
         raise ValueError(msg)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.shares_ram")
+    parser.add_argument("--mode", choices=MODES, default=MODE_STREAMING)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be positive")
+    return args
+
+
+def run(*, mode: str = MODE_STREAMING, workers: int | None = None) -> None:
+    data_file_io = DataFileIO()
+    if mode == MODE_SPILL:
+        with tempfile.TemporaryFile() as spill:
+            total_count, total_sum = data_file_io.read_total_sum_spilled(spill)
+            _validate_total_count(total_count)
+            calculator = SharesCalculator(total_sum)
+            data_file_io.calculate_percentages_spilled(calculator, spill)
+        return
+
+    if mode == MODE_BINARY:
+        total_count, total_sum = data_file_io.read_total_sum_binary()
+        _validate_total_count(total_count)
+        calculator = SharesCalculator(total_sum)
+        data_file_io.calculate_percentages_streaming_binary(calculator)
+        return
+
+    if mode == MODE_MMAP:
+        total_count, total_sum = data_file_io.read_total_sum_mmap()
+        _validate_total_count(total_count)
+        calculator = SharesCalculator(total_sum)
+        data_file_io.calculate_percentages_streaming_mmap(calculator)
+        return
+
+    if mode == MODE_PARALLEL:
+        total_count, total_sum = data_file_io.read_total_sum_parallel(workers)
+        _validate_total_count(total_count)
+        calculator = SharesCalculator(total_sum)
+        data_file_io.calculate_percentages_streaming_mmap(calculator)
+        return
+
+    if mode == MODE_INDEXED:
+        total_count, total_sum = data_file_io.read_total_sum_indexed()
+    else:
+        total_count, total_sum = data_file_io.read_total_sum()
+    _validate_total_count(total_count)
     calculator = SharesCalculator(total_sum)
     data_file_io.calculate_percentages_streaming(calculator)
 
 
+def main() -> None:
+    args = _parse_args()
+    run(mode=args.mode, workers=args.workers)
+
+
 if __name__ == "__main__":
     main()
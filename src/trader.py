@@ -1,10 +1,39 @@
+import argparse
 import logging
+import math
+import os
+import sys
+import time
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
 from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from heapq import merge
+from itertools import accumulate, chain, islice, repeat
+from multiprocessing import Barrier, Process
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Barrier as BarrierType
 from pathlib import Path
+from typing import Any, cast, override
+
+from src.compat import HAS_NUMPY, np
 
 APP_NAME = "trader"
+NUMPY_SPEEDUP = 50
+DEFAULT_EPSILON = 0.1
+CORE_SIZE = 16
+PARALLEL_DP_GROUPS = 2
+PARALLEL_DP_MIN_COMPLEXITY = 1 << 22
+SHARED_DP_MIN_FUNDS = 1 << 16
+SHARED_DP_CELL_OVERHEAD = 3
+DP_MAX_CHOICE_BYTES = 1 << 31
+HIRSCHBERG_BASE_ITEMS = 8
+
+type DPTable = Callable[[list[tuple[int, int, int]], int], tuple[list[int], list[tuple[int, int, bytearray]]]]
 
 
 @dataclass(slots=True)
@@ -35,11 +64,27 @@ class TraderSchema:
             raise ValueError(msg)
 
 
+@dataclass(slots=True)
+class LotItemSchema:
+    lots: tuple[int, ...]
+    profit: int
+    cost: int
+
+
+@dataclass(slots=True)
+class TraderItemsSchema:
+    items: list[LotItemSchema]
+    eliminated_count: int
+    cost_divisor: int
+
+
 @dataclass(slots=True)
 class LotsResultSchema:
     lots: tuple[int, ...] = field(default_factory=tuple)
     profit: int = 0
     cost: int = 0
+    upper_bound: int | None = None
+    optimality_gap: float | None = None
 
 
 class BaseTrader(ABC):
@@ -50,6 +95,7 @@ class BaseTrader(ABC):
         bond_redemtion_days: int,
         bond_par_value: int,
         bond_payment_per_day: int,
+        items_schema: TraderItemsSchema | None = None,
     ) -> None:
         self._total_days = trader_schema.total_days
         self._total_funds = trader_schema.total_funds
@@ -58,6 +104,25 @@ class BaseTrader(ABC):
         self._bond_par_value = bond_par_value
         self._bond_payment_per_day = bond_payment_per_day
         self._days_factor = self._total_days + self._bond_redemtion_days
+        self._items_schema = items_schema or self._prepare_items()
+        self._items = self._items_schema.items
+
+    @property
+    def items_schema(self) -> TraderItemsSchema:
+        return self._items_schema
+
+    @property
+    def eliminated_count(self) -> int:
+        return self._items_schema.eliminated_count
+
+    def _prepare_items(self) -> TraderItemsSchema:
+        merged_items = self._merge_lots()
+        items = self._reduce_items(merged_items)
+        return TraderItemsSchema(
+            items=items,
+            eliminated_count=len(merged_items) - len(items),
+            cost_divisor=math.gcd(*(item.cost for item in items)) or 1,
+        )
 
     def _calculate_profit(self, lot: LotSchema) -> tuple[int, int]:
         lot_price = int(lot.price_percent * self._bond_par_value // 100)
@@ -67,67 +132,766 @@ class BaseTrader(ABC):
         lot_cost = lot.size * lot_price
         return lot_profit, lot_cost
 
-    @classmethod
+    def _merge_lots(self) -> list[LotItemSchema]:
+        groups: dict[tuple[int, str, float, int], list[int]] = {}
+        for idx, lot in enumerate(self._lots):
+            groups.setdefault((lot.day_number, lot.name, lot.price_percent, lot.size), []).append(idx)
+        items: list[LotItemSchema] = []
+        for lots in groups.values():
+            lot_profit, lot_cost = self._calculate_profit(self._lots[lots[0]])
+            position = 0
+            count = 1
+            while position < len(lots):
+                count = min(count, len(lots) - position)
+                items.append(
+                    LotItemSchema(
+                        lots=tuple(lots[position : position + count]),
+                        profit=count * lot_profit,
+                        cost=count * lot_cost,
+                    ),
+                )
+                position += count
+                count *= 2
+        return items
+
+    def _reduce_items(self, items: list[LotItemSchema]) -> list[LotItemSchema]:
+        items = [item for item in items if item.profit > 0 and item.cost <= self._total_funds]
+        items = self._remove_dominated(items)
+        return self._remove_bounded(items)
+
+    def _remove_dominated(self, items: list[LotItemSchema]) -> list[LotItemSchema]:
+        # an item is dropped only when it cannot be taken together with all kept items that dominate it,
+        # so any solution using it can swap it for a dominating item left out of that solution
+        profit_ranks = {
+            profit: rank for rank, profit in enumerate(sorted({item.profit for item in items}, reverse=True), start=1)
+        }
+        dominating_costs = [0] * (len(profit_ranks) + 1)
+        kept: list[int] = []
+        for idx in sorted(range(len(items)), key=lambda x: (items[x].cost, -items[x].profit)):
+            item = items[idx]
+            dominating_cost = 0
+            rank = profit_ranks[item.profit]
+            while rank:
+                dominating_cost += dominating_costs[rank]
+                rank &= rank - 1
+            if item.cost + dominating_cost > self._total_funds:
+                continue
+            kept.append(idx)
+            rank = profit_ranks[item.profit]
+            while rank < len(dominating_costs):
+                dominating_costs[rank] += item.cost
+                rank += rank & -rank
+        return [items[idx] for idx in sorted(kept)]
+
+    def _remove_bounded(self, items: list[LotItemSchema]) -> list[LotItemSchema]:
+        # an item outside the greedy solution is dropped when taking it cannot beat the greedy profit
+        lot_items = sorted(
+            ((idx, item.profit, item.cost) for idx, item in enumerate(items)),
+            key=_get_profit_ratio,
+            reverse=True,
+        )
+        greedy = _calculate_greedy(lot_items, self._total_funds)
+        greedy_items = set(greedy.lots)
+        prefix_costs = [0, *accumulate(lot_cost for _, _, lot_cost in lot_items)]
+        prefix_profits = [0, *accumulate(lot_profit for _, lot_profit, _ in lot_items)]
+        removed = {
+            idx
+            for position, (idx, lot_profit, lot_cost) in enumerate(lot_items)
+            if idx not in greedy_items
+            and lot_profit
+            + _get_fractional_bound(lot_items, prefix_costs, prefix_profits, self._total_funds - lot_cost, position)
+            <= greedy.profit
+        }
+        return [item for idx, item in enumerate(items) if idx not in removed]
+
+    def _get_lots(self, item_indices: Iterable[int]) -> tuple[int, ...]:
+        return tuple(sorted(chain.from_iterable(self._items[idx].lots for idx in item_indices)))
+
+    def _get_cost_divisor(self) -> int:
+        return self._items_schema.cost_divisor
+
+    def _get_scaled_items(self, cost_divisor: int) -> list[tuple[int, int, int]]:
+        return [(idx, item.profit, item.cost // cost_divisor) for idx, item in enumerate(self._items)]
+
+    def _get_dp_complexity(self) -> int:
+        complexity = len(self._items) * (self._total_funds // self._get_cost_divisor())
+        # choice bits for every item and budget have to fit in memory
+        return complexity if complexity >> 3 <= DP_MAX_CHOICE_BYTES else sys.maxsize
+
+    def _calculate_dp(self, dp_table: DPTable) -> LotsResultSchema:
+        cost_divisor = self._get_cost_divisor()
+        total_funds = self._total_funds // cost_divisor
+        max_profit, item_choices = dp_table(self._get_scaled_items(cost_divisor), total_funds)
+        max_funds = max(range(total_funds + 1), key=lambda x: max_profit[x])
+        return LotsResultSchema(
+            lots=self._get_lots(_reconstruct(item_choices, max_funds)),
+            profit=max_profit[max_funds],
+            cost=max_funds * cost_divisor,
+        )
+
     @abstractmethod
-    def get_complexity(cls, trader_schema: TraderSchema) -> int:
+    def get_complexity(self) -> int:
         pass
 
+    def calculate(self, *, timeout: float | None = None) -> LotsResultSchema:
+        if timeout is not None:
+            msg = f"{type(self).__name__} does not support timeout"
+            raise ValueError(msg)
+        return self._calculate()
+
     @abstractmethod
-    def calculate(self) -> LotsResultSchema:
+    def _calculate(self) -> LotsResultSchema:
         pass
 
 
 class TraderSubset(BaseTrader):
-    @classmethod
-    def get_complexity(cls, trader_schema: TraderSchema) -> int:
-        lots_count = len(trader_schema.lots)
-        return lots_count * (2**lots_count)
+    def get_complexity(self) -> int:
+        items_count = len(self._items)
+        return items_count * (2**items_count)
 
-    def calculate(self) -> LotsResultSchema:
+    def _calculate(self) -> LotsResultSchema:
         result = LotsResultSchema()
-        lots_map: dict[tuple[int, ...], tuple[int, int]] = {(): (0, 0)}
-        for idx, lot in enumerate(self._lots):
-            lot_profit, lot_cost = self._calculate_profit(lot)
-            if lot_profit <= 0 or lot_cost > self._total_funds:
-                continue
-            new_lots_map = lots_map.copy()
-            for used_lots, (profit, cost) in lots_map.items():
-                new_profit = profit + lot_profit
-                new_cost = lot_cost + cost
+        items_map: dict[tuple[int, ...], tuple[int, int]] = {(): (0, 0)}
+        for idx, item in enumerate(self._items):
+            new_items_map = items_map.copy()
+            for used_items, (profit, cost) in items_map.items():
+                new_profit = profit + item.profit
+                new_cost = item.cost + cost
                 if new_cost <= self._total_funds:
-                    new_lots = (*used_lots, idx)
-                    new_lots_map[new_lots] = (new_profit, new_cost)
+                    new_items = (*used_items, idx)
+                    new_items_map[new_items] = (new_profit, new_cost)
                     if new_profit > result.profit:
-                        result.lots = new_lots
+                        result.lots = new_items
                         result.profit = new_profit
                         result.cost = new_cost
-            lots_map = new_lots_map
+            items_map = new_items_map
+        result.lots = self._get_lots(result.lots)
         return result
 
 
 class TraderDP(BaseTrader):
-    @classmethod
-    def get_complexity(cls, trader_schema: TraderSchema) -> int:
-        return len(trader_schema.lots) * trader_schema.total_funds
-
-    def calculate(self) -> LotsResultSchema:
-        max_profit = [0] * (self._total_funds + 1)
-        lot_choices: list[list[int]] = [[] for _ in range(self._total_funds + 1)]
-        for idx, lot in enumerate(self._lots):
-            lot_profit, lot_cost = self._calculate_profit(lot)
-            if lot_profit <= 0 or lot_cost > self._total_funds:
+    def get_complexity(self) -> int:
+        return self._get_dp_complexity()
+
+    def _calculate(self) -> LotsResultSchema:
+        return self._calculate_dp(_calculate_dp_table)
+
+
+class TraderDPHirschberg(TraderDP):
+    def get_complexity(self) -> int:
+        return 2 * len(self._items) * (self._total_funds // self._get_cost_divisor())
+
+    def _calculate(self) -> LotsResultSchema:
+        cost_divisor = self._get_cost_divisor()
+        item_indices: list[int] = []
+        stack = [(self._get_scaled_items(cost_divisor), self._total_funds // cost_divisor)]
+        while stack:
+            lot_items, total_funds = stack.pop()
+            if len(lot_items) <= HIRSCHBERG_BASE_ITEMS:
+                _, item_choices = _calculate_dp_table(lot_items, total_funds)
+                item_indices.extend(_reconstruct(item_choices, total_funds))
                 continue
-            for funds in range(self._total_funds, lot_cost - 1, -1):
-                new_profit = max_profit[funds - lot_cost] + lot_profit
-                if new_profit > max_profit[funds]:
-                    max_profit[funds] = new_profit
-                    lot_choices[funds] = lot_choices[funds - lot_cost] + [idx]
-        max_funds = max(range(self._total_funds + 1), key=lambda x: max_profit[x])
+            # split the budget where the best profits of both halves add up to the best profit of the whole
+            half = len(lot_items) // 2
+            left_profit = _calculate_dp_profits(lot_items[:half], total_funds)
+            right_profit = _calculate_dp_profits(lot_items[half:], total_funds)
+            left_funds = max(range(total_funds + 1), key=lambda x: left_profit[x] + right_profit[total_funds - x])
+            stack.append((lot_items[:half], left_funds))
+            stack.append((lot_items[half:], total_funds - left_funds))
+        return LotsResultSchema(
+            lots=self._get_lots(item_indices),
+            profit=sum(self._items[idx].profit for idx in item_indices),
+            cost=sum(self._items[idx].cost for idx in item_indices),
+        )
+
+
+class TraderDPParallel(TraderDP):
+    def __init__(self, trader_schema: TraderSchema, *, workers: int | None = None, **params: Any) -> None:
+        super().__init__(trader_schema, **params)
+        self._workers = min(workers or os.cpu_count() or 1, PARALLEL_DP_GROUPS)
+
+    def get_complexity(self) -> int:
+        complexity = super().get_complexity()
+        if complexity < PARALLEL_DP_MIN_COMPLEXITY or complexity == sys.maxsize:
+            return complexity
+        return complexity // self._workers
+
+    def _calculate(self) -> LotsResultSchema:
+        if self._workers < PARALLEL_DP_GROUPS or super().get_complexity() < PARALLEL_DP_MIN_COMPLEXITY:
+            return super()._calculate()
+        cost_divisor = self._get_cost_divisor()
+        total_funds = self._total_funds // cost_divisor
+        lot_items = self._get_scaled_items(cost_divisor)
+        half = len(lot_items) // 2
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            (left_profit, left_choices), (right_profit, right_choices) = executor.map(
+                _calculate_dp_table,
+                (lot_items[:half], lot_items[half:]),
+                repeat(total_funds),
+            )
+        # rows are already prefix maxima over the budget, so the max-plus merge only needs the final budget
+        left_funds = max(range(total_funds + 1), key=lambda x: left_profit[x] + right_profit[total_funds - x])
+        item_indices = (
+            *_reconstruct(left_choices, left_funds),
+            *_reconstruct(right_choices, total_funds - left_funds),
+        )
         return LotsResultSchema(
-            lots=tuple(lot_choices[max_funds]),
+            lots=self._get_lots(item_indices),
+            profit=sum(self._items[idx].profit for idx in item_indices),
+            cost=sum(self._items[idx].cost for idx in item_indices),
+        )
+
+
+class TraderDPSharedMemory(TraderDP):
+    def __init__(self, trader_schema: TraderSchema, *, workers: int | None = None, **params: Any) -> None:
+        super().__init__(trader_schema, **params)
+        self._workers = workers or os.cpu_count() or 1
+
+    def _is_parallel(self) -> bool:
+        # a shared-memory cell costs about SHARED_DP_CELL_OVERHEAD list cells, so fewer workers only slow it down
+        return (
+            self._workers > SHARED_DP_CELL_OVERHEAD
+            and self._total_funds // self._get_cost_divisor() >= SHARED_DP_MIN_FUNDS
+        )
+
+    def get_complexity(self) -> int:
+        complexity = super().get_complexity()
+        if complexity == sys.maxsize or not self._is_parallel():
+            return complexity
+        return complexity * SHARED_DP_CELL_OVERHEAD // self._workers
+
+    def _calculate(self) -> LotsResultSchema:
+        if not self._is_parallel():
+            return super()._calculate()
+        cost_divisor = self._get_cost_divisor()
+        total_funds = self._total_funds // cost_divisor
+        lot_items = self._get_scaled_items(cost_divisor)
+        row_size = total_funds + 1
+        bits_size = (total_funds >> 3) + 1
+        # budget ranges start at multiples of 8, so workers never share a byte of choice bits
+        step = (row_size + self._workers - 1) // self._workers + 7 & ~7
+        bounds = [(start, min(start + step, row_size)) for start in range(0, row_size, step)]
+        profit_memory = SharedMemory(create=True, size=2 * row_size * array("q").itemsize)
+        choices_memory = SharedMemory(create=True, size=max(len(lot_items) * bits_size, 1))
+        barrier = Barrier(len(bounds))
+        processes = [
+            Process(
+                target=_calculate_dp_range,
+                args=(lot_items, total_funds, range_bounds, (profit_memory.name, choices_memory.name), barrier),
+            )
+            for range_bounds in bounds
+        ]
+        try:
+            for process in processes:
+                process.start()
+            pending = {process.sentinel: process for process in processes}
+            while pending:
+                for sentinel in wait(list(pending)):
+                    process = pending.pop(cast("int", sentinel))
+                    process.join()
+                    if process.exitcode:
+                        # a dead worker never reaches the barrier, so release the others before failing
+                        barrier.abort()
+                        msg = "shared memory DP worker failed"
+                        raise RuntimeError(msg)
+            rows = cast("memoryview", profit_memory.buf).cast("q")
+            row_offset = (len(lot_items) & 1) * row_size
+            max_profit = rows[row_offset : row_offset + row_size].tolist()
+            rows.release()
+            choices = cast("memoryview", choices_memory.buf)
+            item_choices = [
+                (idx, lot_cost, bytearray(choices[position * bits_size : (position + 1) * bits_size]))
+                for position, (idx, _, lot_cost) in enumerate(lot_items)
+            ]
+            choices.release()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            for shared_memory in (profit_memory, choices_memory):
+                shared_memory.close()
+                shared_memory.unlink()
+        max_funds = max(range(row_size), key=lambda x: max_profit[x])
+        return LotsResultSchema(
+            lots=self._get_lots(_reconstruct(item_choices, max_funds)),
             profit=max_profit[max_funds],
-            cost=max_funds,
+            cost=max_funds * cost_divisor,
+        )
+
+
+class TraderDPNumpy(TraderDP):
+    def get_complexity(self) -> int:
+        complexity = super().get_complexity()
+        # sys.maxsize marks choice bits that do not fit in memory, scaling it would let the variant win
+        return complexity if complexity == sys.maxsize else complexity // NUMPY_SPEEDUP
+
+    def _calculate(self) -> LotsResultSchema:
+        return self._calculate_dp(_calculate_dp_table_numpy)
+
+
+class TraderBranchAndBound(BaseTrader):
+    def get_complexity(self) -> int:
+        items_count = len(self._items)
+        sort_complexity = items_count * max(items_count.bit_length(), 1)
+        return sort_complexity + self._get_search_complexity()
+
+    def _get_search_complexity(self) -> int:
+        lot_items = sorted(
+            ((idx, item.profit, item.cost) for idx, item in enumerate(self._items)),
+            key=_get_profit_ratio,
+            reverse=True,
+        )
+        greedy = _calculate_greedy(lot_items, self._total_funds)
+        greedy_items = set(greedy.lots)
+        prefix_costs = [0, *accumulate(lot_cost for _, _, lot_cost in lot_items)]
+        prefix_profits = [0, *accumulate(lot_profit for _, lot_profit, _ in lot_items)]
+        # a lot branches only when the greedy profit prunes neither taking nor skipping it
+        open_count = 0
+        for position, (idx, lot_profit, lot_cost) in enumerate(lot_items):
+            if idx in greedy_items:
+                bound = _get_fractional_bound(lot_items, prefix_costs, prefix_profits, self._total_funds, position)
+            else:
+                funds = self._total_funds - lot_cost
+                bound = lot_profit + _get_fractional_bound(lot_items, prefix_costs, prefix_profits, funds, position)
+            open_count += bound > greedy.profit
+        return len(lot_items) * 2**open_count
+
+    @override
+    def calculate(self, *, timeout: float | None = None) -> LotsResultSchema:
+        return self._calculate_until(None if timeout is None else time.monotonic() + timeout)
+
+    def _calculate(self) -> LotsResultSchema:
+        return self._calculate_until(None)
+
+    def _calculate_until(self, deadline: float | None) -> LotsResultSchema:
+        lot_items = [(idx, item.profit, item.cost) for idx, item in enumerate(self._items)]
+        lot_items.sort(key=_get_profit_ratio, reverse=True)
+
+        result = _calculate_greedy(lot_items, self._total_funds)
+        stack: list[tuple[int, int, int, tuple[int, ...]]] = [(0, self._total_funds, 0, ())]
+        # on equal ratios nothing is pruned, so past the estimated work the DP is cheaper
+        work_budget = (
+            self._get_search_complexity() if deadline is None and self._get_dp_complexity() != sys.maxsize else None
+        )
+        work = 0
+        while stack and (deadline is None or time.monotonic() < deadline):
+            if work_budget is not None and work > work_budget:
+                return self._calculate_dp(_calculate_dp_table_numpy if HAS_NUMPY else _calculate_dp_table)
+            work += 1
+            position, funds, profit, lots = stack.pop()
+            if profit > result.profit:
+                result = LotsResultSchema(lots=lots, profit=profit, cost=self._total_funds - funds)
+            if position == len(lot_items) or _get_upper_bound(lot_items, position, funds, profit) <= result.profit:
+                continue
+            idx, lot_profit, lot_cost = lot_items[position]
+            stack.append((position + 1, funds, profit, lots))
+            if lot_cost <= funds:
+                stack.append((position + 1, funds - lot_cost, profit + lot_profit, (*lots, idx)))
+        if deadline is not None:
+            # unexplored nodes are partial solutions, their bounds cover every solution not searched yet
+            for _, funds, profit, lots in stack:
+                if profit > result.profit:
+                    result = LotsResultSchema(lots=lots, profit=profit, cost=self._total_funds - funds)
+            result.upper_bound = max(
+                [
+                    result.profit,
+                    *(_get_upper_bound(lot_items, position, funds, profit) for position, funds, profit, _ in stack),
+                ],
+            )
+            result.optimality_gap = _get_optimality_gap(result.profit, result.upper_bound)
+        result.lots = self._get_lots(result.lots)
+        return result
+
+
+class TraderMeetInTheMiddle(BaseTrader):
+    def get_complexity(self) -> int:
+        items_count = len(self._items)
+        return items_count * (2 ** ((items_count + 1) // 2))
+
+    def _calculate(self) -> LotsResultSchema:
+        lot_items = [(idx, item.profit, item.cost) for idx, item in enumerate(self._items)]
+        half = len(lot_items) // 2
+        left_items, right_items = lot_items[:half], lot_items[half:]
+        left_frontier = self._get_frontier(left_items)
+        right_frontier = self._get_frontier(right_items)
+
+        result = LotsResultSchema()
+        best_masks = (0, 0)
+        right_position = len(right_frontier) - 1
+        for left_cost, left_profit, left_mask in left_frontier:
+            while right_frontier[right_position][0] > self._total_funds - left_cost:
+                right_position -= 1
+            right_cost, right_profit, right_mask = right_frontier[right_position]
+            if left_profit + right_profit > result.profit:
+                result.profit = left_profit + right_profit
+                result.cost = left_cost + right_cost
+                best_masks = (left_mask, right_mask)
+        result.lots = self._get_lots(
+            idx
+            for items, mask in zip((left_items, right_items), best_masks, strict=True)
+            for position, (idx, _, _) in enumerate(items)
+            if mask >> position & 1
+        )
+        return result
+
+    def _get_frontier(self, lot_items: list[tuple[int, int, int]]) -> list[tuple[int, int, int]]:
+        costs = array("q", [0])
+        profits = array("q", [0])
+        for _, lot_profit, lot_cost in lot_items:
+            costs.extend([cost + lot_cost for cost in costs])
+            profits.extend([profit + lot_profit for profit in profits])
+        frontier: list[tuple[int, int, int]] = []
+        for mask in sorted(range(len(costs)), key=costs.__getitem__):
+            if costs[mask] > self._total_funds:
+                break
+            if not frontier or profits[mask] > frontier[-1][1]:
+                frontier.append((costs[mask], profits[mask], mask))
+        return frontier
+
+
+class TraderPareto(BaseTrader):
+    def get_complexity(self) -> int:
+        items_count = len(self._items)
+        return items_count * min(2**items_count, self._total_funds // self._get_cost_divisor() + 1)
+
+    def _calculate(self) -> LotsResultSchema:
+        costs, profits, nodes = [0], [0], [-1]
+        parents: list[tuple[int, int]] = []
+        for idx, item in enumerate(self._items):
+            new_costs: list[int] = []
+            new_profits: list[int] = []
+            new_nodes: list[int] = []
+            old_position = shifted_position = 0
+            shifted_count = bisect_right(costs, self._total_funds - item.cost)
+            while old_position < len(costs) or shifted_position < shifted_count:
+                if shifted_position == shifted_count or (
+                    old_position < len(costs) and costs[old_position] <= costs[shifted_position] + item.cost
+                ):
+                    cost, profit = costs[old_position], profits[old_position]
+                    parent = None
+                    old_position += 1
+                else:
+                    cost = costs[shifted_position] + item.cost
+                    profit = profits[shifted_position] + item.profit
+                    parent = nodes[shifted_position]
+                    shifted_position += 1
+                if new_profits and profit <= new_profits[-1]:
+                    continue
+                if parent is None:
+                    node = nodes[old_position - 1]
+                else:
+                    parents.append((parent, idx))
+                    node = len(parents) - 1
+                if new_costs and cost == new_costs[-1]:
+                    new_costs.pop()
+                    new_profits.pop()
+                    new_nodes.pop()
+                new_costs.append(cost)
+                new_profits.append(profit)
+                new_nodes.append(node)
+            costs, profits, nodes = new_costs, new_profits, new_nodes
+
+        item_indices: list[int] = []
+        node = nodes[-1]
+        while node != -1:
+            node, idx = parents[node]
+            item_indices.append(idx)
+        return LotsResultSchema(lots=self._get_lots(item_indices), profit=profits[-1], cost=costs[-1])
+
+
+class TraderCore(BaseTrader):
+    def get_complexity(self) -> int:
+        items_count = len(self._items)
+        sort_complexity = items_count * max(items_count.bit_length(), 1)
+        return sort_complexity + self._get_core_complexity()
+
+    def _get_core_complexity(self) -> int:
+        core_count = min(len(self._items), CORE_SIZE)
+        return core_count * min(2**core_count, self._total_funds // self._get_cost_divisor() + 1)
+
+    def _calculate(self) -> LotsResultSchema:
+        lot_items = sorted(
+            ((idx, item.profit, item.cost) for idx, item in enumerate(self._items)),
+            key=_get_profit_ratio,
+            reverse=True,
         )
+        prefix_costs = [0, *accumulate(lot_cost for _, _, lot_cost in lot_items)]
+        break_position = bisect_right(prefix_costs, self._total_funds) - 1
+        break_profit = sum(lot_profit for _, lot_profit, _ in lot_items[:break_position])
+        core_start = core_end = break_position
+        # lots before the core are taken, lots after it are skipped, states keep the lots flipped inside the core
+        states = [(prefix_costs[break_position], break_profit, -1)]
+        parents: list[tuple[int, int]] = []
+        best_profit, best_node = states[0][1], -1
+        # the core can grow to every item on equal ratios, so past the estimated work the DP is cheaper
+        work_budget = self._get_core_complexity() if self._get_dp_complexity() != sys.maxsize else None
+        work = 0
+        while states and (core_start > 0 or core_end < len(lot_items)):
+            if work_budget is not None and work > work_budget:
+                return self._calculate_dp(_calculate_dp_table_numpy if HAS_NUMPY else _calculate_dp_table)
+            if core_end < len(lot_items):
+                idx, lot_profit, lot_cost = lot_items[core_end]
+                states = _flip_item(states, parents, idx, lot_cost, lot_profit)
+                core_end += 1
+            if core_start > 0:
+                core_start -= 1
+                idx, lot_profit, lot_cost = lot_items[core_start]
+                states = _flip_item(states, parents, idx, -lot_cost, -lot_profit)
+            for cost, profit, node in states:
+                if cost <= self._total_funds and profit > best_profit:
+                    best_profit, best_node = profit, node
+            states = [
+                state
+                for state in states
+                if _get_core_bound(lot_items, core_start, core_end, self._total_funds, state) > best_profit
+            ]
+            work += len(states)
+
+        flipped: set[int] = set()
+        node = best_node
+        while node != -1:
+            node, idx = parents[node]
+            flipped.add(idx)
+        item_indices = flipped.symmetric_difference(idx for idx, _, _ in lot_items[:break_position])
+        return LotsResultSchema(
+            lots=self._get_lots(item_indices),
+            profit=best_profit,
+            cost=sum(self._items[idx].cost for idx in item_indices),
+        )
+
+
+class TraderProfitDP(BaseTrader):
+    def get_complexity(self) -> int:
+        return len(self._items) * self._get_total_profit()
+
+    def _get_profit_scale(self) -> float:
+        return 1
+
+    def _get_total_profit(self) -> int:
+        profit_scale = self._get_profit_scale()
+        return sum(int(item.profit // profit_scale) for item in self._items)
+
+    def _calculate(self) -> LotsResultSchema:
+        profit_scale = self._get_profit_scale()
+        total_profit = self._get_total_profit()
+        min_cost = [0] + [self._total_funds + 1] * total_profit
+        item_choices: list[tuple[int, int, bytearray]] = []
+        for idx, item in enumerate(self._items):
+            item_profit = int(item.profit // profit_scale)
+            taken = bytearray((total_profit >> 3) + 1)
+            for profit in range(total_profit, item_profit - 1, -1):
+                new_cost = min_cost[profit - item_profit] + item.cost
+                if new_cost < min_cost[profit]:
+                    min_cost[profit] = new_cost
+                    taken[profit >> 3] |= 1 << (profit & 7)
+            item_choices.append((idx, item_profit, taken))
+        max_profit = max(profit for profit in range(total_profit + 1) if min_cost[profit] <= self._total_funds)
+        item_indices = _reconstruct(item_choices, max_profit)
+        return LotsResultSchema(
+            lots=self._get_lots(item_indices),
+            profit=sum(self._items[idx].profit for idx in item_indices),
+            cost=sum(self._items[idx].cost for idx in item_indices),
+        )
+
+
+class TraderFPTAS(TraderProfitDP):
+    def __init__(self, trader_schema: TraderSchema, *, epsilon: float = DEFAULT_EPSILON, **params: Any) -> None:
+        super().__init__(trader_schema, **params)
+        self._epsilon = epsilon
+
+    def _get_profit_scale(self) -> float:
+        if not self._items:
+            return 1
+        return max(self._epsilon * max(item.profit for item in self._items) / len(self._items), 1)
+
+    def _calculate(self) -> LotsResultSchema:
+        result = super()._calculate()
+        profit_scale = self._get_profit_scale()
+        profit_error = len(self._items) * profit_scale if profit_scale > 1 else 0
+        result.upper_bound = result.profit + math.floor(profit_error)
+        result.optimality_gap = _get_optimality_gap(result.profit, result.upper_bound)
+        return result
+
+
+def _calculate_dp_table(
+    lot_items: list[tuple[int, int, int]],
+    total_funds: int,
+) -> tuple[list[int], list[tuple[int, int, bytearray]]]:
+    max_profit = [0] * (total_funds + 1)
+    item_choices: list[tuple[int, int, bytearray]] = []
+    for idx, lot_profit, lot_cost in lot_items:
+        taken = bytearray((total_funds >> 3) + 1)
+        for funds in range(total_funds, lot_cost - 1, -1):
+            new_profit = max_profit[funds - lot_cost] + lot_profit
+            if new_profit > max_profit[funds]:
+                max_profit[funds] = new_profit
+                taken[funds >> 3] |= 1 << (funds & 7)
+        item_choices.append((idx, lot_cost, taken))
+    return max_profit, item_choices
+
+
+def _calculate_dp_table_numpy(
+    lot_items: list[tuple[int, int, int]],
+    total_funds: int,
+) -> tuple[list[int], list[tuple[int, int, bytearray]]]:
+    max_profit = np.zeros(total_funds + 1, dtype=np.int64)
+    item_choices: list[tuple[int, int, bytearray]] = []
+    for idx, lot_profit, lot_cost in lot_items:
+        shifted = max_profit[: total_funds + 1 - lot_cost] + lot_profit
+        taken = np.zeros(total_funds + 1, dtype=np.bool_)
+        taken[lot_cost:] = shifted > max_profit[lot_cost:]
+        np.maximum(max_profit[lot_cost:], shifted, out=max_profit[lot_cost:])
+        item_choices.append((idx, lot_cost, bytearray(np.packbits(taken, bitorder="little"))))
+    return max_profit.tolist(), item_choices
+
+
+def _calculate_dp_profits(lot_items: list[tuple[int, int, int]], total_funds: int) -> list[int]:
+    max_profit = [0] * (total_funds + 1)
+    for _, lot_profit, lot_cost in lot_items:
+        for funds in range(total_funds, lot_cost - 1, -1):
+            max_profit[funds] = max(max_profit[funds], max_profit[funds - lot_cost] + lot_profit)
+    return max_profit
+
+
+def _calculate_dp_range(
+    lot_items: list[tuple[int, int, int]],
+    total_funds: int,
+    bounds: tuple[int, int],
+    memory_names: tuple[str, str],
+    barrier: BarrierType,
+) -> None:
+    start, end = bounds
+    profit_memory, choices_memory = (SharedMemory(name=name) for name in memory_names)
+    rows = cast("memoryview", profit_memory.buf).cast("q")
+    choices = cast("memoryview", choices_memory.buf)
+    row_size = total_funds + 1
+    bits_size = (total_funds >> 3) + 1
+    try:
+        for position, (_, lot_profit, lot_cost) in enumerate(lot_items):
+            # rows are double-buffered: item `position` reads one row and writes the other
+            old_offset = (position & 1) * row_size
+            new_offset = row_size - old_offset
+            new_profits = array("q", rows[old_offset + start : old_offset + end])
+            taken = bytearray((end - start + 7) >> 3)
+            for funds in range(max(start, lot_cost), end):
+                new_profit = rows[old_offset + funds - lot_cost] + lot_profit
+                if new_profit > new_profits[funds - start]:
+                    new_profits[funds - start] = new_profit
+                    taken[(funds - start) >> 3] |= 1 << (funds & 7)
+            rows[new_offset + start : new_offset + end] = new_profits
+            choices_offset = position * bits_size + (start >> 3)
+            choices[choices_offset : choices_offset + len(taken)] = taken
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        rows.release()
+        choices.release()
+        profit_memory.close()
+        choices_memory.close()
+
+
+def _reconstruct(item_choices: list[tuple[int, int, bytearray]], position: int) -> tuple[int, ...]:
+    item_indices: list[int] = []
+    for idx, item_weight, taken in reversed(item_choices):
+        if taken[position >> 3] >> (position & 7) & 1:
+            item_indices.append(idx)
+            position -= item_weight
+    return tuple(reversed(item_indices))
+
+
+def _flip_item(
+    states: list[tuple[int, int, int]],
+    parents: list[tuple[int, int]],
+    idx: int,
+    lot_cost: int,
+    lot_profit: int,
+) -> list[tuple[int, int, int]]:
+    new_states: list[tuple[int, int, int]] = []
+    for cost, profit, node, is_flipped in merge(
+        ((cost, profit, node, False) for cost, profit, node in states),
+        ((cost + lot_cost, profit + lot_profit, node, True) for cost, profit, node in states),
+        key=lambda state: (state[0], -state[1]),
+    ):
+        if new_states and profit <= new_states[-1][1]:
+            continue
+        if is_flipped:
+            parents.append((node, idx))
+            node = len(parents) - 1  # noqa: PLW2901
+        new_states.append((cost, profit, node))
+    return new_states
+
+
+def _get_core_bound(
+    lot_items: list[tuple[int, int, int]],
+    core_start: int,
+    core_end: int,
+    total_funds: int,
+    state: tuple[int, int, int],
+) -> float:
+    cost, profit, _ = state
+    if cost <= total_funds:
+        if core_end == len(lot_items):
+            return profit
+        _, lot_profit, lot_cost = lot_items[core_end]
+        return profit + (total_funds - cost) * lot_profit // lot_cost if lot_cost else math.inf
+    if core_start == 0:
+        return -math.inf
+    _, lot_profit, lot_cost = lot_items[core_start - 1]
+    return profit - (cost - total_funds) * lot_profit // lot_cost if lot_cost else -math.inf
+
+
+def _get_profit_ratio(lot_item: tuple[int, int, int]) -> float:
+    _, lot_profit, lot_cost = lot_item
+    return lot_profit / lot_cost if lot_cost else math.inf
+
+
+def _calculate_greedy(lot_items: list[tuple[int, int, int]], total_funds: int) -> LotsResultSchema:
+    result = LotsResultSchema()
+    for idx, lot_profit, lot_cost in lot_items:
+        if result.cost + lot_cost <= total_funds:
+            result.lots = (*result.lots, idx)
+            result.profit += lot_profit
+            result.cost += lot_cost
+    return result
+
+
+def _get_fractional_bound(
+    lot_items: list[tuple[int, int, int]],
+    prefix_costs: list[int],
+    prefix_profits: list[int],
+    funds: int,
+    excluded: int,
+) -> int:
+    _, excluded_profit, excluded_cost = lot_items[excluded]
+    low, high = 0, len(lot_items)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if prefix_costs[middle] - (excluded_cost if excluded < middle else 0) <= funds:
+            low = middle
+        else:
+            high = middle - 1
+    profit = prefix_profits[low] - (excluded_profit if excluded < low else 0)
+    funds -= prefix_costs[low] - (excluded_cost if excluded < low else 0)
+    if low < len(lot_items):
+        _, lot_profit, lot_cost = lot_items[low]
+        profit += lot_profit * funds // lot_cost
+    return profit
+
+
+def _get_optimality_gap(profit: int, upper_bound: int) -> float:
+    return (upper_bound - profit) / upper_bound if upper_bound else 0.0
+
+
+def _get_upper_bound(lot_items: list[tuple[int, int, int]], position: int, funds: int, profit: int) -> int:
+    for _, lot_profit, lot_cost in islice(lot_items, position, None):
+        if lot_cost > funds:
+            return profit + lot_profit * funds // lot_cost
+        funds -= lot_cost
+        profit += lot_profit
+    return profit
 
 
 class DataFileIO:
@@ -171,26 +935,63 @@ class DataFileIO:
                 file.write(f"{lot.day_number} {lot.name} {lot.price_percent} {lot.size}\n")
 
 
-def _get_trader_class(trader_schema: TraderSchema) -> type[BaseTrader]:
+def _get_trader(trader_schema: TraderSchema, **bond_params: int) -> BaseTrader:
     trader_classes: tuple[type[BaseTrader], ...] = (
         TraderSubset,
         TraderDP,
+        TraderDPHirschberg,
+        TraderDPParallel,
+        TraderDPSharedMemory,
+        *((TraderDPNumpy,) if HAS_NUMPY else ()),
+        TraderBranchAndBound,
+        TraderMeetInTheMiddle,
+        TraderPareto,
+        TraderCore,
+        TraderProfitDP,
+    )
+    # lots are merged and reduced once, every candidate strategy shares the same items
+    traders = [trader_classes[0](trader_schema, items_schema=None, **bond_params)]
+    traders.extend(
+        strategy(trader_schema, items_schema=traders[0].items_schema, **bond_params) for strategy in trader_classes[1:]
     )
-    return min(trader_classes, key=lambda strategy: strategy.get_complexity(trader_schema))
+    return min(traders, key=lambda trader: trader.get_complexity())
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog=f"python -m src.{APP_NAME}")
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument("--epsilon", type=float, default=None)
+    mode_group.add_argument("--timeout", type=float, default=None)
+    args = parser.parse_args()
+    if args.epsilon is not None and not 0 < args.epsilon < 1:
+        parser.error("--epsilon must be between 0 and 1")
+    if args.timeout is not None and args.timeout <= 0:
+        parser.error("--timeout must be positive")
+    return args
 
 
 def main() -> None:
     logger = logging.getLogger(APP_NAME)
     logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
 
     data_file_io = DataFileIO()
     trader_schema = data_file_io.read_input()
     trader_schema.validate()
 
-    trader_class = _get_trader_class(trader_schema)
-    logger.info("selected class: %s", trader_class.__name__)
-    trader = trader_class(trader_schema, bond_redemtion_days=30, bond_par_value=1000, bond_payment_per_day=1)
-    result = trader.calculate()
+    bond_params = {"bond_redemtion_days": 30, "bond_par_value": 1000, "bond_payment_per_day": 1}
+    trader: BaseTrader
+    if args.epsilon is not None:
+        logger.info("selected class: %s", TraderFPTAS.__name__)
+        trader = TraderFPTAS(trader_schema, epsilon=args.epsilon, **bond_params)
+    elif args.timeout is not None:
+        logger.info("selected class: %s", TraderBranchAndBound.__name__)
+        trader = TraderBranchAndBound(trader_schema, items_schema=None, **bond_params)
+    else:
+        trader = _get_trader(trader_schema, **bond_params)
+        logger.info("selected class: %s", type(trader).__name__)
+    logger.info("eliminated items: %s", trader.eliminated_count)
+    result = trader.calculate(timeout=args.timeout)
     logger.info("result: %s", result)
 
     result_lots = [trader_schema.lots[lot_idx] for lot_idx in sorted(result.lots)]